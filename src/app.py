@@ -8,6 +8,8 @@ for extracurricular activities at Mergington High School.
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
+from pydantic import BaseModel
+import copy
 import os
 from pathlib import Path
 
@@ -19,73 +21,97 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+# In-memory activity database. Participants are stored as sets for O(1)
+# membership checks and serialized as sorted lists in responses.
 activities = {
     "Tennis Club": {
         "description": "Learn tennis skills and participate in friendly matches",
         "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
         "max_participants": 16,
-        "participants": ["alex@mergington.edu"]
+        "participants": {"alex@mergington.edu"}
         },
         "Basketball Team": {
         "description": "Competitive basketball training and games",
         "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
         "max_participants": 15,
-        "participants": ["james@mergington.edu", "sarah@mergington.edu"]
+        "participants": {"james@mergington.edu", "sarah@mergington.edu"}
         },
         "Drama Club": {
         "description": "Perform in theatrical productions and develop acting skills",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 25,
-        "participants": ["grace@mergington.edu"]
+        "participants": {"grace@mergington.edu"}
         },
         "Art Studio": {
         "description": "Explore painting, drawing, and sculpture techniques",
         "schedule": "Saturdays, 10:00 AM - 12:00 PM",
         "max_participants": 20,
-        "participants": ["isabella@mergington.edu", "noah@mergington.edu"]
+        "participants": {"isabella@mergington.edu", "noah@mergington.edu"}
         },
         "Debate Team": {
         "description": "Develop public speaking and critical thinking skills through debate competitions",
         "schedule": "Mondays and Fridays, 3:30 PM - 4:30 PM",
         "max_participants": 18,
-        "participants": ["lucas@mergington.edu"]
+        "participants": {"lucas@mergington.edu"}
         },
         "Robotics Club": {
         "description": "Build and program robots for STEM competitions",
         "schedule": "Thursdays, 4:00 PM - 5:30 PM",
         "max_participants": 14,
-        "participants": ["ava@mergington.edu", "ethan@mergington.edu"]
+        "participants": {"ava@mergington.edu", "ethan@mergington.edu"}
         },
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
     }
 }
 
+class SignupItem(BaseModel):
+    activity: str
+    email: str
+
+
+class SignupBatch(BaseModel):
+    items: list[SignupItem]
+
 
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
+def serialize_activity(activity):
+    """Return a JSON-ready copy of an activity with participants as a list"""
+    return {**activity, "participants": sorted(activity["participants"])}
+
+
 @app.get("/activities")
 def get_activities():
-    return activities
+    return {name: serialize_activity(activity) for name, activity in activities.items()}
+
+
+@app.get("/activities/{activity_name}")
+def get_activity(activity_name: str):
+    """Get the details of a single activity"""
+    # Validate activity exists
+    if activity_name not in activities:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    return serialize_activity(activities[activity_name])
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -102,10 +128,26 @@ def signup_for_activity(activity_name: str, email: str):
     if email in activity["participants"]:
         raise HTTPException(status_code=400, detail="Student already signed up for this activity")
     # Add student
-    activity["participants"].append(email)
+    activity["participants"].add(email)
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
+@app.post("/activities/signup_batch")
+def signup_batch(batch: SignupBatch):
+    """Sign up several students for activities in one request"""
+    results = []
+    for item in batch.items:
+        result = {"activity": item.activity, "email": item.email}
+        try:
+            result.update(signup_for_activity(item.activity, item.email))
+            result["status_code"] = 200
+        except HTTPException as e:
+            result["status_code"] = e.status_code
+            result["detail"] = e.detail
+        results.append(result)
+    return {"results": results}
+
+
 @app.delete("/activities/{activity_name}/unregister")
 def unregister_from_activity(activity_name: str, email: str):
     """Unregister a student from an activity"""
@@ -123,3 +165,15 @@ def unregister_from_activity(activity_name: str, email: str):
     # Remove student
     activity["participants"].remove(email)
     return {"message": f"Unregistered {email} from {activity_name}"}
+
+
+if os.environ.get("ENABLE_TEST_RESET"):
+    # Initial activity data, restored by the test-only reset endpoint
+    _ORIGINAL_ACTIVITIES = copy.deepcopy(activities)
+
+    @app.post("/__reset__", include_in_schema=False)
+    def reset_activities_for_tests():
+        """Restore activities to their initial state (test use only)"""
+        activities.clear()
+        activities.update(copy.deepcopy(_ORIGINAL_ACTIVITIES))
+        return {"message": "Activities reset"}
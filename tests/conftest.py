@@ -0,0 +1,26 @@
+"""
+Shared fixtures for the Mergington High School Activities API tests
+"""
+
+import os
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+# Must be set before importing the app so it registers POST /__reset__
+os.environ["ENABLE_TEST_RESET"] = "1"
+
+from src.app import app
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run async tests and fixtures on asyncio"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """Create an in-process ASGI client shared by the whole session"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
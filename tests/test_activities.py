@@ -2,56 +2,68 @@
 Tests for the Mergington High School Activities API
 """
 
+from urllib.parse import quote
+
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from src.app import app, activities
+from src.app import activities
 
+pytestmark = pytest.mark.anyio
+
+
+# URL-escaped path of every activity, built once at import
+ACTIVITY_URLS = {name: f"/activities/{quote(name)}" for name in activities}
+NONEXISTENT_ACTIVITY_URL = f"/activities/{quote('Nonexistent Club')}"
+
+
+def pjson(response):
+    """Parse a response body with orjson"""
+    return orjson.loads(response.content)
+
+
+async def signup(client, activity, email):
+    """Sign up a student for an activity"""
+    return await client.post(f"{ACTIVITY_URLS[activity]}/signup?email={quote(email)}")
 
-@pytest.fixture
-def client():
-    """Create a test client"""
-    return TestClient(app)
 
+async def unregister(client, activity, email):
+    """Unregister a student from an activity"""
+    return await client.delete(f"{ACTIVITY_URLS[activity]}/unregister?email={quote(email)}")
 
+
+async def signup_batch(client, items):
+    """Sign up several (activity, email) pairs in one request"""
+    return await client.post(
+        "/activities/signup_batch",
+        json={"items": [{"activity": a, "email": e} for a, e in items]}
+    )
+
+
+# Only TestSignup, TestUnregister and TestIntegration mutate `activities`.
+# They apply `reset_activities` via usefixtures and share the
+# "activities_state" xdist group, which keeps them together on one worker
+# under `--dist loadgroup`. TestActivities and TestErrors are read-only and
+# need neither.
 @pytest.fixture
-def reset_activities():
-    """Reset activities to known state before each test"""
-    # Save original state
-    original_activities = {
-        k: {
-            "description": v["description"],
-            "schedule": v["schedule"],
-            "max_participants": v["max_participants"],
-            "participants": v["participants"].copy()
-        }
-        for k, v in activities.items()
-    }
-    
+async def reset_activities(client):
+    """Reset activities to their initial state after each test"""
     yield
-    
-    # Restore original state
-    for k, v in original_activities.items():
-        activities[k]["participants"] = v["participants"]
+
+    response = await client.post("/__reset__")
+    assert response.status_code == 200
 
 
 class TestActivities:
     """Test the /activities endpoint"""
     
-    def test_get_activities(self, client):
-        """Test retrieving all activities"""
-        response = client.get("/activities")
+    async def test_get_activities(self, client):
+        """Test retrieving all activities and their structure"""
+        response = await client.get("/activities")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert isinstance(data, dict)
         assert "Tennis Club" in data
         assert "Basketball Team" in data
-        assert all("description" in activity for activity in data.values())
-        assert all("participants" in activity for activity in data.values())
-    
-    def test_get_activities_structure(self, client):
-        """Test that activity data has correct structure"""
-        response = client.get("/activities")
-        data = response.json()
         
         for activity_name, activity in data.items():
             assert isinstance(activity_name, str)
@@ -61,149 +73,153 @@ class TestActivities:
             assert "participants" in activity
             assert isinstance(activity["participants"], list)
 
+    async def test_get_single_activity(self, client):
+        """Test retrieving one activity by name"""
+        response = await client.get(ACTIVITY_URLS["Tennis Club"])
+        assert response.status_code == 200
+        data = pjson(response)
+        assert data["schedule"] == "Mondays and Wednesdays, 4:00 PM - 5:30 PM"
+        assert data["participants"] == ["alex@mergington.edu"]
+
+    async def test_get_nonexistent_activity(self, client):
+        """Test retrieving an activity that doesn't exist"""
+        response = await client.get(NONEXISTENT_ACTIVITY_URL)
+        assert response.status_code == 404
+        assert "Activity not found" in pjson(response)["detail"]
+
 
+@pytest.mark.xdist_group("activities_state")
+@pytest.mark.usefixtures("reset_activities")
 class TestSignup:
     """Test the signup endpoint"""
     
-    def test_signup_success(self, client, reset_activities):
+    async def test_signup_success(self, client):
         """Test successful signup"""
-        response = client.post(
-            "/activities/Tennis Club/signup",
-            params={"email": "newstudent@mergington.edu"}
-        )
+        response = await signup(client, "Tennis Club", "newstudent@mergington.edu")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert "message" in data
         assert "Signed up" in data["message"]
         
         # Verify student was added
-        response = client.get("/activities")
-        activities_data = response.json()
-        assert "newstudent@mergington.edu" in activities_data["Tennis Club"]["participants"]
+        activity_data = pjson(await client.get(ACTIVITY_URLS["Tennis Club"]))
+        assert "newstudent@mergington.edu" in activity_data["participants"]
     
-    def test_signup_duplicate_registration(self, client, reset_activities):
+    async def test_signup_duplicate_registration(self, client):
         """Test that duplicate signups are rejected"""
         email = "existing@mergington.edu"
         
         # First signup
-        response1 = client.post(
-            "/activities/Tennis Club/signup",
-            params={"email": email}
-        )
+        response1 = await signup(client, "Tennis Club", email)
         assert response1.status_code == 200
         
         # Duplicate signup should fail
-        response2 = client.post(
-            "/activities/Tennis Club/signup",
-            params={"email": email}
-        )
+        response2 = await signup(client, "Tennis Club", email)
         assert response2.status_code == 400
-        assert "already signed up" in response2.json()["detail"]
+        assert "already signed up" in pjson(response2)["detail"]
     
-    def test_signup_to_nonexistent_activity(self, client, reset_activities):
-        """Test signup to activity that doesn't exist"""
-        response = client.post(
-            "/activities/Nonexistent Club/signup",
-            params={"email": "student@mergington.edu"}
-        )
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
-    
-    def test_signup_existing_participant(self, client, reset_activities):
-        """Test that existing participants can't signup again"""
-        response = client.post(
-            "/activities/Tennis Club/signup",
-            params={"email": "alex@mergington.edu"}
-        )
-        assert response.status_code == 400
-        assert "already signed up" in response.json()["detail"]
+    async def test_signup_batch_reports_each_item(self, client):
+        """Test that a batch signup reports success or failure per item"""
+        response = await signup_batch(client, [
+            ("Tennis Club", "batch@mergington.edu"),
+            ("Tennis Club", "alex@mergington.edu"),
+            ("Nonexistent Club", "batch@mergington.edu"),
+        ])
+        assert response.status_code == 200
+        results = pjson(response)["results"]
+        assert [r["status_code"] for r in results] == [200, 400, 404]
+        assert "Signed up" in results[0]["message"]
+        assert "already signed up" in results[1]["detail"]
+        assert "Activity not found" in results[2]["detail"]
 
 
+@pytest.mark.xdist_group("activities_state")
+@pytest.mark.usefixtures("reset_activities")
 class TestUnregister:
     """Test the unregister endpoint"""
     
-    def test_unregister_success(self, client, reset_activities):
+    async def test_unregister_success(self, client):
         """Test successful unregistration"""
         # First signup
-        signup_response = client.post(
-            "/activities/Debate Team/signup",
-            params={"email": "toremove@mergington.edu"}
-        )
+        signup_response = await signup(client, "Debate Team", "toremove@mergington.edu")
         assert signup_response.status_code == 200
         
         # Then unregister
-        response = client.delete(
-            "/activities/Debate Team/unregister",
-            params={"email": "toremove@mergington.edu"}
-        )
+        response = await unregister(client, "Debate Team", "toremove@mergington.edu")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert "message" in data
         assert "Unregistered" in data["message"]
         
         # Verify student was removed
-        response = client.get("/activities")
-        activities_data = response.json()
-        assert "toremove@mergington.edu" not in activities_data["Debate Team"]["participants"]
-    
-    def test_unregister_nonexistent_activity(self, client, reset_activities):
-        """Test unregister from activity that doesn't exist"""
-        response = client.delete(
-            "/activities/Nonexistent Club/unregister",
-            params={"email": "student@mergington.edu"}
-        )
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
-    
-    def test_unregister_not_signed_up(self, client, reset_activities):
-        """Test unregistering a student not signed up for activity"""
-        response = client.delete(
-            "/activities/Tennis Club/unregister",
-            params={"email": "notstudent@mergington.edu"}
-        )
-        assert response.status_code == 400
-        assert "not signed up" in response.json()["detail"]
+        activity_data = pjson(await client.get(ACTIVITY_URLS["Debate Team"]))
+        assert "toremove@mergington.edu" not in activity_data["participants"]
     
-    def test_unregister_existing_participant(self, client, reset_activities):
+    async def test_unregister_existing_participant(self, client):
         """Test unregistering an existing participant"""
-        response = client.delete(
-            "/activities/Tennis Club/unregister",
-            params={"email": "alex@mergington.edu"}
-        )
+        response = await unregister(client, "Tennis Club", "alex@mergington.edu")
         assert response.status_code == 200
         
         # Verify student was removed
-        response = client.get("/activities")
-        activities_data = response.json()
-        assert "alex@mergington.edu" not in activities_data["Tennis Club"]["participants"]
+        activity_data = pjson(await client.get(ACTIVITY_URLS["Tennis Club"]))
+        assert "alex@mergington.edu" not in activity_data["participants"]
+
+
+class TestErrors:
+    """Test error responses shared by the signup and unregister endpoints"""
+
+    @pytest.mark.parametrize("method,path", [
+        ("post", "signup"),
+        ("delete", "unregister"),
+    ])
+    async def test_nonexistent_activity(self, client, method, path):
+        """Test signup/unregister for an activity that doesn't exist"""
+        response = await getattr(client, method)(
+            f"{NONEXISTENT_ACTIVITY_URL}/{path}?email={quote('student@mergington.edu')}"
+        )
+        assert response.status_code == 404
+        assert "Activity not found" in pjson(response)["detail"]
+
+    @pytest.mark.parametrize("method,path,email,detail", [
+        ("post", "signup", "alex@mergington.edu", "already signed up"),
+        ("delete", "unregister", "notstudent@mergington.edu", "not signed up"),
+    ])
+    async def test_invalid_registration_state(self, client, method, path, email, detail):
+        """Test signing up twice or unregistering a student who isn't signed up"""
+        response = await getattr(client, method)(
+            f"{ACTIVITY_URLS['Tennis Club']}/{path}?email={quote(email)}"
+        )
+        assert response.status_code == 400
+        assert detail in pjson(response)["detail"]
 
 
+@pytest.mark.xdist_group("activities_state")
+@pytest.mark.usefixtures("reset_activities")
 class TestIntegration:
     """Integration tests for complex scenarios"""
     
-    def test_signup_unregister_signup_cycle(self, client, reset_activities):
+    async def test_signup_unregister_signup_cycle(self, client):
         """Test full cycle of signup, unregister, and signup again"""
         email = "student@mergington.edu"
         activity = "Drama Club"
         
         # Sign up
-        response1 = client.post(f"/activities/{activity}/signup", params={"email": email})
+        response1 = await signup(client, activity, email)
         assert response1.status_code == 200
         
         # Unregister
-        response2 = client.delete(f"/activities/{activity}/unregister", params={"email": email})
+        response2 = await unregister(client, activity, email)
         assert response2.status_code == 200
         
         # Sign up again (should succeed)
-        response3 = client.post(f"/activities/{activity}/signup", params={"email": email})
+        response3 = await signup(client, activity, email)
         assert response3.status_code == 200
         
         # Verify student is registered
-        response = client.get("/activities")
-        activities_data = response.json()
+        activities_data = pjson(await client.get("/activities"))
         assert email in activities_data[activity]["participants"]
     
-    def test_multiple_students_signup(self, client, reset_activities):
+    async def test_multiple_students_signup(self, client):
         """Test multiple students signing up for different activities"""
         students = [
             ("student1@mergington.edu", "Chess Club"),
@@ -213,11 +229,28 @@ class TestIntegration:
         
         # Sign up all students
         for email, activity in students:
-            response = client.post(f"/activities/{activity}/signup", params={"email": email})
+            response = await signup(client, activity, email)
             assert response.status_code == 200
         
         # Verify all signups
-        response = client.get("/activities")
-        activities_data = response.json()
+        activities_data = pjson(await client.get("/activities"))
+        for email, activity in students:
+            assert email in activities_data[activity]["participants"]
+    
+    async def test_multiple_students_batch_signup(self, client):
+        """Test multiple students signing up for different activities in one request"""
+        students = [
+            ("student1@mergington.edu", "Chess Club"),
+            ("student2@mergington.edu", "Robotics Club"),
+            ("student3@mergington.edu", "Art Studio"),
+        ]
+        
+        # Sign up all students in one request
+        response = await signup_batch(client, [(a, e) for e, a in students])
+        assert response.status_code == 200
+        assert all(r["status_code"] == 200 for r in pjson(response)["results"])
+        
+        # Verify all signups
+        activities_data = pjson(await client.get("/activities"))
         for email, activity in students:
             assert email in activities_data[activity]["participants"]